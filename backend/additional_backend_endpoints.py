@@ -81,7 +81,7 @@ async def import_clients_json(coach_id: str, import_data: ImportData):
                         client_data['phone_number'] = '+1' + client_data['phone_number'].lstrip('0')
 
                     # Insert client
-                    client_id = str(uuid.uuid4())
+                    client_id = uuid.uuid4()
                     await db.execute(
                         """INSERT INTO clients (id, coach_id, name, phone_number, country, timezone)
                            VALUES ($1, $2, $3, $4, $5, $6)""",
@@ -102,8 +102,10 @@ async def import_clients_json(coach_id: str, import_data: ImportData):
             "message": f"Successfully imported {imported_count} clients"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Import clients error: {e}")
+        logger.exception(f"Import clients error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to import clients: {str(e)}")
 
 
@@ -133,7 +135,7 @@ async def create_template(coach_id: str, template_data: TemplateCreate):
             raise HTTPException(status_code=400, detail=f"Invalid message type. Must be one of: {valid_types}")
         
         # Create template
-        template_id = str(uuid.uuid4())
+        template_id = uuid.uuid4()
         
         await db.execute(
             "INSERT INTO message_templates (id, coach_id, message_type, content, is_default) VALUES ($1, $2, $3, $4, false)",
@@ -141,14 +143,16 @@ async def create_template(coach_id: str, template_data: TemplateCreate):
         )
         
         return {
-            "template_id": template_id,
+            "template_id": str(template_id),
             "message_type": message_type,
             "content": content,
             "status": "created"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Create template error: {e}")
+        logger.exception(f"Create template error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create template: {str(e)}")
 
 @router.get("/coaches/{coach_id}/templates")
@@ -180,7 +184,7 @@ async def get_message_templates(coach_id: str, message_type: str = None):
             ]
     
     except Exception as e:
-        logger.error(f"Get templates error: {e}")
+        logger.exception(f"Get templates error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch templates")
 
 @router.put("/templates/{template_id}/language-code")
@@ -209,7 +213,7 @@ async def update_template_language_code(template_id: str, language_code: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Update language code error: {e}")
+        logger.exception(f"Update language code error: {e}")
         raise HTTPException(status_code=500, detail="Failed to update language code")
 
 @router.get("/templates/{template_id}")
@@ -242,7 +246,7 @@ async def get_template_details(template_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Get template details error: {e}")
+        logger.exception(f"Get template details error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch template details")
 
 @router.get("/coaches/{coach_id}/analytics")
@@ -287,7 +291,7 @@ async def get_message_analytics(coach_id: str, days: int = 30):
             }
     
     except Exception as e:
-        logger.error(f"Analytics error: {e}")
+        logger.exception(f"Analytics error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch analytics")
 
 @router.get("/coaches/{coach_id}/clients/{client_id}/history")
@@ -322,7 +326,7 @@ async def get_client_message_history(coach_id: str, client_id: str, limit: int =
             ]
     
     except Exception as e:
-        logger.error(f"Get history error: {e}")
+        logger.exception(f"Get history error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch history")
 
 @router.put("/coaches/{coach_id}/clients/{client_id}")
@@ -365,7 +369,7 @@ async def update_client(coach_id: str, client_id: str, client_data: dict):
             return {"status": "updated"}
     
     except Exception as e:
-        logger.error(f"Update client error: {e}")
+        logger.exception(f"Update client error: {e}")
         raise HTTPException(status_code=500, detail="Failed to update client")
 
 @router.delete("/coaches/{coach_id}/clients/{client_id}")
@@ -381,7 +385,7 @@ async def delete_client(coach_id: str, client_id: str):
             return {"status": "deleted"}
     
     except Exception as e:
-        logger.error(f"Delete client error: {e}")
+        logger.exception(f"Delete client error: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete client")
 
 @router.get("/coaches/{coach_id}/scheduled-messages")
@@ -420,7 +424,7 @@ async def get_scheduled_messages(coach_id: str):
             ]
     
     except Exception as e:
-        logger.error(f"Get scheduled messages error: {e}")
+        logger.exception(f"Get scheduled messages error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch scheduled messages")
 
 @router.delete("/scheduled-messages/{message_id}")
@@ -436,7 +440,7 @@ async def cancel_scheduled_message(message_id: str):
             return {"status": "cancelled"}
     
     except Exception as e:
-        logger.error(f"Cancel message error: {e}")
+        logger.exception(f"Cancel message error: {e}")
         raise HTTPException(status_code=500, detail="Failed to cancel message")
 
 @router.get("/coaches/{coach_id}/goals")
@@ -474,7 +478,7 @@ async def get_client_goals(coach_id: str):
             ]
     
     except Exception as e:
-        logger.error(f"Get goals error: {e}")
+        logger.exception(f"Get goals error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch goals")
 
 @router.post("/coaches/{coach_id}/clients/{client_id}/goals")
@@ -516,8 +520,10 @@ async def create_client_goal(coach_id: str, client_id: str, goal_data: GoalCreat
             
             return {"goal_id": str(goal_id), "status": "created"}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Create goal error: {e}")
+        logger.exception(f"Create goal error: {e}")
         raise HTTPException(status_code=500, detail="Failed to create goal")
 
 @router.get("/coaches/{coach_id}/stats")
@@ -566,7 +572,7 @@ async def get_coach_stats(coach_id: str):
             }
     
     except Exception as e:
-        logger.error(f"Get stats error: {e}")
+        logger.exception(f"Get stats error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch stats")
 
 # Enhanced Google Contacts integration
@@ -595,8 +601,10 @@ async def import_google_contacts(coach_id: str, google_data: GoogleContactsImpor
             "message": "Google Contacts integration not fully implemented yet"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Import Google contacts error: {e}")
+        logger.exception(f"Import Google contacts error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to import Google contacts: {str(e)}")
 
 # Bulk operations
@@ -632,7 +640,7 @@ async def send_bulk_message(coach_id: str, bulk_data: dict):
         return {"message_ids": message_ids, "status": "queued"}
     
     except Exception as e:
-        logger.error(f"Bulk message error: {e}")
+        logger.exception(f"Bulk message error: {e}")
         raise HTTPException(status_code=500, detail="Failed to send bulk message")
 
 
@@ -119,7 +119,7 @@ async def get_system_stats(
             }
     
     except Exception as e:
-        logger.error(f"Get system stats error: {e}")
+        logger.exception(f"Get system stats error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch system statistics")
 
 @router.get("/coaches")
@@ -162,7 +162,7 @@ async def get_all_coaches(admin: dict = Depends(verify_admin_access)):
             ]
     
     except Exception as e:
-        logger.error(f"Get all coaches error: {e}")
+        logger.exception(f"Get all coaches error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch coaches")
 
 @router.get("/activity")
@@ -251,7 +251,7 @@ async def get_recent_activity(
             return all_activities[:limit]
     
     except Exception as e:
-        logger.error(f"Get recent activity error: {e}")
+        logger.exception(f"Get recent activity error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch recent activity")
 
 @router.get("/export-report")
@@ -345,7 +345,7 @@ async def export_system_report(
             )
     
     except Exception as e:
-        logger.error(f"Export report error: {e}")
+        logger.exception(f"Export report error: {e}")
         raise HTTPException(status_code=500, detail="Failed to export report")
 
 @router.get("/coaches/{coach_id}/detailed")
@@ -435,8 +435,10 @@ async def get_coach_detailed_stats(
                 ]
             }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get coach detailed stats error: {e}")
+        logger.exception(f"Get coach detailed stats error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch coach statistics")
 
 @router.post("/coaches/{coach_id}/suspend")
@@ -477,7 +479,7 @@ async def suspend_coach(
             }
     
     except Exception as e:
-        logger.error(f"Suspend coach error: {e}")
+        logger.exception(f"Suspend coach error: {e}")
         raise HTTPException(status_code=500, detail="Failed to suspend coach")
 
 @router.post("/system/restart")
@@ -501,7 +503,7 @@ async def restart_system_services(admin: dict = Depends(verify_admin_access)):
         return {"status": "restart_initiated", "message": "Background services restarting..."}
     
     except Exception as e:
-        logger.error(f"System restart error: {e}")
+        logger.exception(f"System restart error: {e}")
         raise HTTPException(status_code=500, detail="Failed to restart services")
 
 @router.get("/system/performance")
@@ -557,7 +559,7 @@ async def get_system_performance(admin: dict = Depends(verify_admin_access)):
         }
     
     except Exception as e:
-        logger.error(f"Get system performance error: {e}")
+        logger.exception(f"Get system performance error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch performance metrics")
 
 @router.post("/maintenance/cleanup")
@@ -575,7 +577,7 @@ async def trigger_maintenance_cleanup(admin: dict = Depends(verify_admin_access)
         }
     
     except Exception as e:
-        logger.error(f"Maintenance cleanup error: {e}")
+        logger.exception(f"Maintenance cleanup error: {e}")
         raise HTTPException(status_code=500, detail="Failed to initiate cleanup")
 
 @router.get("/logs")
@@ -613,7 +615,7 @@ async def get_system_logs(
         return log_entries[:limit]
     
     except Exception as e:
-        logger.error(f"Get system logs error: {e}")
+        logger.exception(f"Get system logs error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch system logs")
 
 @router.post("/coaches/{coach_id}/reset-api")
@@ -641,7 +643,7 @@ async def reset_coach_whatsapp_api(
             return {"status": "token_updated", "coach_id": coach_id}
     
     except Exception as e:
-        logger.error(f"Reset API token error: {e}")
+        logger.exception(f"Reset API token error: {e}")
         raise HTTPException(status_code=500, detail="Failed to reset API token")
 
 @router.get("/analytics/summary")
@@ -738,7 +740,7 @@ async def get_analytics_summary(
             }
     
     except Exception as e:
-        logger.error(f"Get analytics summary error: {e}")
+        logger.exception(f"Get analytics summary error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch analytics summary")
 
 @router.get("/system/queue-status")
@@ -783,7 +785,7 @@ async def get_queue_status(admin: dict = Depends(verify_admin_access)):
         }
     
     except Exception as e:
-        logger.error(f"Get queue status error: {e}")
+        logger.exception(f"Get queue status error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch queue status")
 
 @router.post("/system/clear-cache")
@@ -811,7 +813,7 @@ async def clear_system_cache(admin: dict = Depends(verify_admin_access)):
         }
     
     except Exception as e:
-        logger.error(f"Clear cache error: {e}")
+        logger.exception(f"Clear cache error: {e}")
         raise HTTPException(status_code=500, detail="Failed to clear cache")
 
 @router.get("/errors/recent")
@@ -876,7 +878,7 @@ async def get_recent_errors(
             return all_errors[:limit]
     
     except Exception as e:
-        logger.error(f"Get recent errors error: {e}")
+        logger.exception(f"Get recent errors error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch recent errors")
 
 # Add admin actions tracking table to database schema
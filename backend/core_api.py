@@ -6,12 +6,14 @@ FastAPI application handling WhatsApp integration, voice processing, and schedul
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 import asyncio
 import asyncpg
 import openai
 import httpx
 import json
+import hmac
+import uuid
 from datetime import datetime, timedelta, timezone
 import pytz
 from google.oauth2.credentials import Credentials
@@ -43,7 +45,7 @@ class MessageRequest(BaseModel):
     client_ids: List[str]
     message_type: str  # 'celebration' or 'accountability'
     content: str
-    schedule_type: str  # 'now', 'specific', 'recurring'
+    schedule_type: Literal['now', 'specific', 'recurring']
     scheduled_time: Optional[datetime] = None
     recurring_pattern: Optional[Dict[str, Any]] = None
 
@@ -83,6 +85,18 @@ from .whatsapp_templates import template_manager
 # Initialize template manager with database connection
 template_manager.set_db_pool(db.pool)
 
+# Deactivate a user's existing conversations and open a new one in a single
+# round-trip; the CTE's UPDATE runs against the pre-INSERT snapshot, so the
+# new row stays active
+RECORD_CONVERSATION_SQL = """
+    WITH deactivated AS (
+        UPDATE whatsapp_conversations SET is_active = false WHERE wa_id = $1
+    )
+    INSERT INTO whatsapp_conversations 
+    (wa_id, conversation_id, origin_type, initiated_at, expires_at)
+    VALUES ($1, $2, $3, NOW(), $4)
+"""
+
 # WhatsApp Business API client
 class WhatsAppClient:
     def __init__(self, access_token: str, phone_number_id: str):
@@ -238,7 +252,7 @@ class WhatsAppClient:
     async def can_send_free_message(self, wa_id: str) -> bool:
         """Check if we can send a free message to this user (within 24h window)"""
         try:
-            async with db.pool.acquire() as conn:
+            async with db.acquire() as conn:
                 result = await conn.fetchval(
                     "SELECT can_send_free_message($1)", wa_id
                 )
@@ -250,7 +264,7 @@ class WhatsAppClient:
     async def get_active_conversation(self, wa_id: str) -> Optional[Dict[str, Any]]:
         """Get active conversation for a user"""
         try:
-            async with db.pool.acquire() as conn:
+            async with db.acquire() as conn:
                 result = await conn.fetchrow(
                     "SELECT * FROM get_active_conversation($1)", wa_id
                 )
@@ -262,18 +276,10 @@ class WhatsAppClient:
     async def record_conversation(self, wa_id: str, conversation_id: str, origin_type: str, expires_at: str) -> None:
         """Record a new conversation"""
         try:
-            async with db.pool.acquire() as conn:
-                # Deactivate existing conversations for this user
-                await conn.execute(
-                    "UPDATE whatsapp_conversations SET is_active = false WHERE wa_id = $1",
-                    wa_id
-                )
-                
-                # Insert new conversation
+            async with db.acquire() as conn:
+                # Deactivate existing conversations and insert the new one
                 await conn.execute(
-                    """INSERT INTO whatsapp_conversations 
-                       (wa_id, conversation_id, origin_type, initiated_at, expires_at)
-                       VALUES ($1, $2, $3, NOW(), $4)""",
+                    RECORD_CONVERSATION_SQL,
                     wa_id, conversation_id, origin_type, expires_at
                 )
                 logger.info(f"Recorded conversation for {wa_id}: {conversation_id}")
@@ -416,7 +422,7 @@ class GoogleSheetsService:
         """Create or update Google Sheet with client data"""
         try:
             # Check if sheet exists for this coach
-            async with db.pool.acquire() as conn:
+            async with db.acquire() as conn:
                 sheet_record = await conn.fetchrow(
                     "SELECT sheet_id, sheet_url FROM google_sheets_sync WHERE coach_id = $1 ORDER BY created_at DESC LIMIT 1",
                     coach_id
@@ -453,9 +459,10 @@ class GoogleSheetsService:
                 ).execute()
             else:
                 # Create new sheet
+                now = datetime.now(timezone.utc)
                 spreadsheet = {
                     'properties': {
-                        'title': f'Coaching Data - {datetime.now().strftime("%Y-%m-%d")}'
+                        'title': f'Coaching Data - {now.strftime("%Y-%m-%d")}'
                     }
                 }
                 sheet = self.service.spreadsheets().create(body=spreadsheet).execute()
@@ -471,11 +478,11 @@ class GoogleSheetsService:
                 ).execute()
                 
                 # Save sheet info to database
-                async with db.pool.acquire() as conn:
+                async with db.acquire() as conn:
                     await conn.execute(
                         """INSERT INTO google_sheets_sync (coach_id, sheet_id, sheet_url, last_sync_at, sync_status, row_count)
                            VALUES ($1, $2, $3, $4, 'success', $5)""",
-                        coach_id, sheet_id, sheet_url, datetime.now(), len(rows)
+                        coach_id, sheet_id, sheet_url, now, len(rows)
                     )
             
             return sheet_id
@@ -510,35 +517,33 @@ async def register_coach(registration: CoachRegistration):
     try:
         logger.info(f"Registration request: {registration}")
         
-        # Check if barcode already exists
-        logger.info(f"Checking for existing barcode: {registration.barcode}")
-        existing = await db.fetchrow(
-            "SELECT id FROM coaches WHERE registration_barcode = $1",
-            registration.barcode
-        )
-        logger.info(f"Existing check result: {existing}")
-        
-        if existing:
-            return {"status": "existing", "coach_id": str(existing[0])}
-        
-        # Create new coach  
-        import uuid
-        coach_id = str(uuid.uuid4())
-        logger.info(f"Generated coach_id: {coach_id}")
-        
+        # Insert and detect an existing barcode in one round-trip
+        coach_id = uuid.uuid4()
         logger.info(f"Inserting coach: name={registration.name}, email={registration.email}")
-        await db.execute(
+        inserted = await db.fetchval(
             """INSERT INTO coaches (id, name, email, whatsapp_token, timezone, registration_barcode)
-               VALUES ($1, $2, $3, $4, $5, $6)""",
+               VALUES ($1, $2, $3, $4, $5, $6)
+               ON CONFLICT (registration_barcode) DO NOTHING
+               RETURNING id""",
             coach_id, registration.name, registration.email, registration.whatsapp_token,
             registration.timezone, registration.barcode
         )
+        
+        if inserted is None:
+            # Barcode already registered - only hit on the rare re-scan path
+            existing = await db.fetchval(
+                "SELECT id FROM coaches WHERE registration_barcode = $1",
+                registration.barcode
+            )
+            logger.info(f"Barcode already registered: {registration.barcode}")
+            return {"status": "existing", "coach_id": str(existing)}
+        
         logger.info("Coach inserted successfully")
         
-        return {"status": "registered", "coach_id": coach_id}
+        return {"status": "registered", "coach_id": str(coach_id)}
     
     except Exception as e:
-        logger.error(f"Registration error: {e}")
+        logger.exception(f"Registration error: {e}")
         raise HTTPException(status_code=500, detail="Registration failed")
 
 @router.get("/coaches/{coach_id}/clients")
@@ -569,7 +574,7 @@ async def get_clients(coach_id: str):
         return result
     
     except Exception as e:
-        logger.error(f"Get clients error: {e}")
+        logger.exception(f"Get clients error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch clients")
 
 @router.post("/coaches/{coach_id}/clients")
@@ -586,8 +591,7 @@ async def add_client(coach_id: str, client: Client):
             raise HTTPException(status_code=404, detail="Coach not found")
         
         # Insert client
-        import uuid
-        client_id = str(uuid.uuid4())
+        client_id = uuid.uuid4()
         
         await db.execute(
             """INSERT INTO clients (id, coach_id, name, phone_number, country, timezone)
@@ -597,34 +601,39 @@ async def add_client(coach_id: str, client: Client):
         
         # Add categories if provided
         if client.categories:
-            for category_name in client.categories:
-                    # Check if category exists (predefined or custom for this coach)
-                category = await db.fetchrow(
-                    "SELECT id FROM categories WHERE name = $1 AND (is_predefined = true OR coach_id = $2)",
-                    category_name, coach_id
+            async with db.acquire() as conn:
+                # Resolve all requested categories (predefined or custom for this coach) in one query
+                rows = await conn.fetch(
+                    "SELECT name, id FROM categories WHERE name = ANY($1::text[]) AND (is_predefined = true OR coach_id = $2)",
+                    client.categories, coach_id
                 )
+                category_ids = {row['name']: row['id'] for row in rows}
                 
-                if category:
-                    await db.execute(
-                        "INSERT INTO client_categories (client_id, category_id) VALUES ($1, $2) ON CONFLICT DO NOTHING",
-                        client_id, category[0]
-                    )
-                else:
-                    # Create custom category if it doesn't exist
-                    category_id = str(uuid.uuid4())
-                    await db.execute(
+                # Create custom categories that don't exist yet
+                new_categories = [
+                    (uuid.uuid4(), category_name, coach_id)
+                    for category_name in dict.fromkeys(client.categories)
+                    if category_name not in category_ids
+                ]
+                if new_categories:
+                    await conn.executemany(
                         "INSERT INTO categories (id, name, coach_id, is_predefined) VALUES ($1, $2, $3, false)",
-                        category_id, category_name, coach_id
-                    )
-                    await db.execute(
-                        "INSERT INTO client_categories (client_id, category_id) VALUES ($1, $2)",
-                        client_id, category_id
+                        new_categories
                     )
+                    category_ids.update({category_name: category_id for category_id, category_name, _ in new_categories})
+                
+                # Link the client to every category in a single batch
+                await conn.executemany(
+                    "INSERT INTO client_categories (client_id, category_id) VALUES ($1, $2) ON CONFLICT DO NOTHING",
+                    [(client_id, category_id) for category_id in category_ids.values()]
+                )
         
-        return {"client_id": client_id, "status": "created"}
+        return {"client_id": str(client_id), "status": "created"}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Add client error: {e}")
+        logger.exception(f"Add client error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to add client: {str(e)}")
 
 @router.post("/messages/send")
@@ -635,7 +644,10 @@ async def send_messages(message_request: MessageRequest, background_tasks: Backg
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
+        # One timestamp for every message in this request
+        now = datetime.now(timezone.utc)
+        
+        async with db.acquire() as conn:
             message_ids = []
             
             for client_id in message_request.client_ids:
@@ -654,12 +666,11 @@ async def send_messages(message_request: MessageRequest, background_tasks: Backg
                 if message_request.schedule_type == 'specific' and message_request.scheduled_time:
                     if isinstance(message_request.scheduled_time, str):
                         # Convert ISO string to datetime
-                        from datetime import datetime
                         scheduled_time = datetime.fromisoformat(message_request.scheduled_time.replace('Z', '+00:00'))
                     else:
                         scheduled_time = message_request.scheduled_time
                 elif message_request.schedule_type == 'now':
-                    scheduled_time = datetime.now()
+                    scheduled_time = now
                 
                 # Create scheduled message record
                 scheduled_id = await conn.fetchval(
@@ -684,8 +695,10 @@ async def send_messages(message_request: MessageRequest, background_tasks: Backg
         
         return {"message_ids": message_ids, "status": "scheduled"}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Send messages error: {e}")
+        logger.exception(f"Send messages error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to schedule messages: {str(e)}")
 
 async def send_immediate_message(scheduled_message_id: str):
@@ -693,74 +706,71 @@ async def send_immediate_message(scheduled_message_id: str):
     print(f"🚀 Starting background task for message ID: {scheduled_message_id}")
     logger.info(f"🚀 Starting background task for message ID: {scheduled_message_id}")
     try:
-        async with db.pool.acquire() as conn:
+        # Never hold a pooled connection across WhatsApp API calls: load the
+        # message, release the connection, send, then reacquire to record it
+        async with db.acquire() as conn:
             # Get message details
             message_data = await conn.fetchrow(
-                """SELECT sm.*, c.phone_number, co.whatsapp_token, co.whatsapp_phone_number
+                """SELECT sm.*, c.phone_number, c.name AS client_name, co.whatsapp_token, co.whatsapp_phone_number
                    FROM scheduled_messages sm
                    JOIN clients c ON sm.client_id = c.id
                    JOIN coaches co ON sm.coach_id = co.id
                    WHERE sm.id = $1""",
                 scheduled_message_id
             )
+        
+        if not message_data:
+            return
+        
+        # Send via WhatsApp
+        whatsapp_client = WhatsAppClient(
+            os.getenv("WHATSAPP_ACCESS_TOKEN"),
+            os.getenv("WHATSAPP_PHONE_NUMBER_ID")
+        )
+        
+        # Clean phone number for conversation tracking
+        clean_phone = ''.join(filter(str.isdigit, message_data['phone_number']))
+        
+        # Import template manager
+        from .whatsapp_templates import template_manager
+        
+        # Check if this is a template message (celebration/accountability from DB)
+        if template_manager.is_template_message(message_data['content']):
+            # This is an initiation message - send as template
+            template_name = template_manager.get_template_name(message_data['content'])
+            logger.info(f"📤 Sending template message: {template_name}")
             
-            if not message_data:
-                return
-            
-            # Send via WhatsApp
-            whatsapp_client = WhatsAppClient(
-                os.getenv("WHATSAPP_ACCESS_TOKEN"),
-                os.getenv("WHATSAPP_PHONE_NUMBER_ID")
+            result = await whatsapp_client.send_template_with_parameters(
+                message_data['phone_number'],
+                template_name,
+                [message_data['client_name'] or "Friend"]  # Use client name as parameter
             )
             
-            # Clean phone number for conversation tracking
-            clean_phone = ''.join(filter(str.isdigit, message_data['phone_number']))
-            
-            # Import template manager
-            from .whatsapp_templates import template_manager
+        else:
+            # Check if we can send free message (within 24h window)
+            can_send_free = await whatsapp_client.can_send_free_message(clean_phone)
             
-            # Check if this is a template message (celebration/accountability from DB)
-            if template_manager.is_template_message(message_data['content']):
-                # This is an initiation message - send as template
-                template_name = template_manager.get_template_name(message_data['content'])
-                logger.info(f"📤 Sending template message: {template_name}")
-                
-                # Get client name for template parameter
-                client_name = await conn.fetchval(
-                    "SELECT name FROM clients WHERE id = $1", 
-                    message_data['client_id']
-                )
-                
-                result = await whatsapp_client.send_template_with_parameters(
+            if can_send_free:
+                # Send as free text message
+                logger.info(f"📤 Sending free text message to {clean_phone}")
+                result = await whatsapp_client.send_text_message(
                     message_data['phone_number'],
-                    template_name,
-                    [client_name or "Friend"]  # Use client name as parameter
+                    message_data['content']
                 )
-                
             else:
-                # Check if we can send free message (within 24h window)
-                can_send_free = await whatsapp_client.can_send_free_message(clean_phone)
-                
-                if can_send_free:
-                    # Send as free text message
-                    logger.info(f"📤 Sending free text message to {clean_phone}")
-                    result = await whatsapp_client.send_text_message(
-                        message_data['phone_number'],
-                        message_data['content']
-                    )
-                else:
-                    # Outside 24h window - send as template (this will be charged)
-                    logger.warning(f"⚠️ Outside 24h window for {clean_phone}, sending as template")
-                    result = await whatsapp_client.send_message(
-                        message_data['phone_number'],
-                        message_data['content'],
-                        "hello_world"  # Fallback template
-                    )
-            
+                # Outside 24h window - send as template (this will be charged)
+                logger.warning(f"⚠️ Outside 24h window for {clean_phone}, sending as template")
+                result = await whatsapp_client.send_message(
+                    message_data['phone_number'],
+                    message_data['content'],
+                    "hello_world"  # Fallback template
+                )
+        
+        async with db.acquire() as conn:
             # Update status and create history record
             await conn.execute(
                 "UPDATE scheduled_messages SET status = 'sent', sent_at = $1 WHERE id = $2",
-                datetime.now(), scheduled_message_id
+                datetime.now(timezone.utc), scheduled_message_id
             )
             
             await conn.execute(
@@ -772,59 +782,61 @@ async def send_immediate_message(scheduled_message_id: str):
             )
     
     except Exception as e:
-        logger.error(f"Send immediate message error: {e}")
+        logger.exception(f"Send immediate message error: {e}")
 
 @router.post("/voice/process")
 async def process_voice_message(voice_data: VoiceMessageProcessing):
     """Process voice message - transcribe and correct"""
     try:
-        async with db.pool.acquire() as conn:
-            # Create processing record
-            processing_id = await conn.fetchval(
-                """INSERT INTO voice_message_processing 
-                   (coach_id, whatsapp_message_id, original_audio_url, processing_status)
-                   VALUES ($1, $2, $3, 'received') RETURNING id""",
-                voice_data.coach_id, voice_data.whatsapp_message_id, voice_data.audio_url
-            )
-            
-            # Transcribe audio
-            transcribed_text = await transcription_service.transcribe_audio(voice_data.audio_url)
-            
-            await conn.execute(
-                "UPDATE voice_message_processing SET transcribed_text = $1, processing_status = 'transcribed' WHERE id = $2",
-                transcribed_text, processing_id
-            )
-            
-            # Correct with AI
-            corrected_text = await transcription_service.correct_message(transcribed_text)
-            
-            await conn.execute(
-                "UPDATE voice_message_processing SET corrected_text = $1, processing_status = 'corrected' WHERE id = $2",
-                corrected_text, processing_id
-            )
-            
-            # Send confirmation message with buttons
-            coach_data = await conn.fetchrow("SELECT * FROM coaches WHERE id = $1", voice_data.coach_id)
-            whatsapp_client = WhatsAppClient(os.getenv("WHATSAPP_ACCESS_TOKEN"), os.getenv("WHATSAPP_PHONE_NUMBER_ID"))
-            
-            confirmation_message = f"Corrected message:\n\n{corrected_text}\n\nPlease confirm or edit:"
-            buttons = [
-                {"id": f"confirm_{processing_id}", "title": "Confirm"},
-                {"id": f"edit_{processing_id}", "title": "Edit"}
-            ]
-            
-            await whatsapp_client.send_interactive_message(
-                coach_data['whatsapp_phone_number'],  # Send back to coach
-                confirmation_message,
-                buttons
-            )
-            
-            return {"processing_id": str(processing_id), "corrected_text": corrected_text}
+        # Each DB step takes its own short-lived connection so none is held
+        # while waiting on OpenAI or WhatsApp
+        
+        # Create processing record
+        processing_id = await db.fetchval(
+            """INSERT INTO voice_message_processing 
+               (coach_id, whatsapp_message_id, original_audio_url, processing_status)
+               VALUES ($1, $2, $3, 'received') RETURNING id""",
+            voice_data.coach_id, voice_data.whatsapp_message_id, voice_data.audio_url
+        )
+        
+        # Transcribe audio
+        transcribed_text = await transcription_service.transcribe_audio(voice_data.audio_url)
+        
+        await db.execute(
+            "UPDATE voice_message_processing SET transcribed_text = $1, processing_status = 'transcribed' WHERE id = $2",
+            transcribed_text, processing_id
+        )
+        
+        # Correct with AI
+        corrected_text = await transcription_service.correct_message(transcribed_text)
+        
+        await db.execute(
+            "UPDATE voice_message_processing SET corrected_text = $1, processing_status = 'corrected' WHERE id = $2",
+            corrected_text, processing_id
+        )
+        
+        # Send confirmation message with buttons
+        coach_data = await db.fetchrow("SELECT * FROM coaches WHERE id = $1", voice_data.coach_id)
+        whatsapp_client = WhatsAppClient(os.getenv("WHATSAPP_ACCESS_TOKEN"), os.getenv("WHATSAPP_PHONE_NUMBER_ID"))
+        
+        confirmation_message = f"Corrected message:\n\n{corrected_text}\n\nPlease confirm or edit:"
+        buttons = [
+            {"id": f"confirm_{processing_id}", "title": "Confirm"},
+            {"id": f"edit_{processing_id}", "title": "Edit"}
+        ]
+        
+        await whatsapp_client.send_interactive_message(
+            coach_data['whatsapp_phone_number'],  # Send back to coach
+            confirmation_message,
+            buttons
+        )
+        
+        return {"processing_id": str(processing_id), "corrected_text": corrected_text}
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Voice processing error: {e}")
+        logger.exception(f"Voice processing error: {e}")
         raise HTTPException(status_code=500, detail="Voice processing failed")
 
 @router.get("/test-webhook")
@@ -842,7 +854,9 @@ async def test_webhook_path():
 @router.get("/webhook/whatsapp")
 async def verify_webhook(request: Request):
     """Verify webhook endpoint for Meta - following Meta's exact specification"""
-    expected_token = os.getenv("WEBHOOK_VERIFY_TOKEN", "test-verify-token")
+    # Read per request (not cached) so rotating the token needs no restart.
+    # No fallback: a well-known default would let anyone subscribe the webhook.
+    expected_token = os.getenv("WEBHOOK_VERIFY_TOKEN")
     
     # Get query parameters exactly as Meta sends them
     query_params = dict(request.query_params)
@@ -852,13 +866,24 @@ async def verify_webhook(request: Request):
     verify_token = query_params.get("hub.verify_token") 
     challenge = query_params.get("hub.challenge")
     
+    # Constant-time compare so the token can't be probed byte by byte
+    tokens_match = bool(expected_token) and verify_token is not None and hmac.compare_digest(
+        verify_token.encode(), expected_token.encode()
+    )
+    
+    # Never log the token itself, only whether one was sent
+    redacted_params = {
+        key: ("<redacted>" if key == "hub.verify_token" else value)
+        for key, value in query_params.items()
+    }
+    
     logger.info(f"🔍 Webhook verification attempt:")
-    logger.info(f"   All query params: {query_params}")
+    logger.info(f"   All query params: {redacted_params}")
     logger.info(f"   hub.mode: {mode}")
-    logger.info(f"   hub.verify_token: {verify_token}")
+    logger.info(f"   hub.verify_token present: {verify_token is not None}")
     logger.info(f"   hub.challenge: {challenge}")
-    logger.info(f"   expected_token: {expected_token}")
-    logger.info(f"   tokens_match: {verify_token == expected_token}")
+    logger.info(f"   expected_token configured: {bool(expected_token)}")
+    logger.info(f"   tokens_match: {tokens_match}")
     logger.info(f"   mode_check: {mode == 'subscribe'}")
     
     # If no parameters provided, return a helpful message
@@ -866,12 +891,16 @@ async def verify_webhook(request: Request):
         logger.info("📝 Webhook endpoint accessed without parameters")
         return {"message": "Webhook endpoint is accessible. Use Meta's verification parameters.", "status": "ready"}
     
+    if not expected_token:
+        logger.error("❌ WEBHOOK_VERIFY_TOKEN not set - refusing webhook verification")
+        raise HTTPException(status_code=403, detail="Forbidden")
+    
     # Follow Meta's exact specification
-    if mode == "subscribe" and verify_token == expected_token:
+    if mode == "subscribe" and tokens_match:
         logger.info("✅ WEBHOOK VERIFIED")
         return int(challenge)
     else:
-        logger.warning(f"❌ Webhook verification failed: mode={mode}, token={verify_token}")
+        logger.warning(f"❌ Webhook verification failed: mode={mode}, tokens_match={tokens_match}")
         raise HTTPException(status_code=403, detail="Forbidden")
 
 @router.post("/webhook/whatsapp")
@@ -879,7 +908,7 @@ async def whatsapp_webhook(webhook_data: WhatsAppWebhook, background_tasks: Back
     """Handle incoming WhatsApp webhooks"""
     try:
         # Store webhook data
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             webhook_id = await conn.fetchval(
                 "INSERT INTO whatsapp_webhooks (webhook_data) VALUES ($1) RETURNING id",
                 json.dumps(webhook_data.dict())
@@ -891,46 +920,40 @@ async def whatsapp_webhook(webhook_data: WhatsAppWebhook, background_tasks: Back
         return {"status": "received"}
     
     except Exception as e:
-        logger.error(f"Webhook error: {e}")
+        logger.exception(f"Webhook error: {e}")
         return {"status": "error"}
 
 async def process_whatsapp_webhook(webhook_id: str, webhook_data: Dict[str, Any]):
     """Process WhatsApp webhook data with conversation tracking"""
     try:
-        async with db.pool.acquire() as conn:
-            for entry in webhook_data.get('entry', []):
-                for change in entry.get('changes', []):
-                    if change.get('field') == 'messages':
-                        messages = change.get('value', {}).get('messages', [])
-                        contacts = change.get('value', {}).get('contacts', [])
+        for entry in webhook_data.get('entry', []):
+            for change in entry.get('changes', []):
+                if change.get('field') == 'messages':
+                    messages = change.get('value', {}).get('messages', [])
+                    contacts = change.get('value', {}).get('contacts', [])
+                    
+                    for message in messages:
+                        wa_id = message.get("from")
+                        message_id = message.get("id")
                         
-                        for message in messages:
-                            wa_id = message.get("from")
-                            message_id = message.get("id")
-                            
-                            # Find contact info
-                            contact_info = next((c for c in contacts if c.get("wa_id") == wa_id), {})
-                            user_name = contact_info.get("profile", {}).get("name", "Unknown")
-                            
-                            logger.info(f"📨 Received message from {wa_id} ({user_name}): {message_id}")
-                            
+                        # Find contact info
+                        contact_info = next((c for c in contacts if c.get("wa_id") == wa_id), {})
+                        user_name = contact_info.get("profile", {}).get("name", "Unknown")
+                        
+                        logger.info(f"📨 Received message from {wa_id} ({user_name}): {message_id}")
+                        
+                        # Record the message and look up the coach, then release the
+                        # connection before any OpenAI/WhatsApp/Sheets work below
+                        async with db.acquire() as conn:
                             # Create user-initiated conversation window (24 hours from now)
                             try:
                                 logger.info(f"🔍 Creating conversation window for {wa_id}")
                                 
-                                # Deactivate existing conversations for this user
-                                await conn.execute(
-                                    "UPDATE whatsapp_conversations SET is_active = false WHERE wa_id = $1",
-                                    wa_id
-                                )
-                                logger.info(f"🔍 Deactivated existing conversations for {wa_id}")
-                                
-                                # Insert new user-initiated conversation (24 hours from now)
+                                # Deactivate existing conversations and insert a new
+                                # user-initiated conversation (24 hours from now)
                                 expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
                                 await conn.execute(
-                                    """INSERT INTO whatsapp_conversations 
-                                       (wa_id, conversation_id, origin_type, initiated_at, expires_at)
-                                       VALUES ($1, $2, $3, NOW(), $4)""",
+                                    RECORD_CONVERSATION_SQL,
                                     wa_id, f"user_msg_{message_id}", "user_initiated", expires_at
                                 )
                                 
@@ -953,53 +976,54 @@ async def process_whatsapp_webhook(webhook_id: str, webhook_data: Dict[str, Any]
                                 logger.info(f"💾 Stored message from {wa_id}")
                             except Exception as msg_error:
                                 logger.error(f"❌ Error storing message: {msg_error}")
-                            from_number = message.get('from')
-                            message_type = message.get('type')
                             
                             # Find coach by phone number
                             coach = await conn.fetchrow(
                                 "SELECT * FROM coaches WHERE whatsapp_phone_number = $1",
-                                from_number
+                                message.get('from')
                             )
+                        
+                        if not coach:
+                            continue
+                        
+                        message_type = message.get('type')
+                        
+                        if message_type == 'interactive':
+                            # Handle button clicks (Confirm/Edit)
+                            button_reply = message.get('interactive', {}).get('button_reply', {})
+                            button_id = button_reply.get('id', '')
                             
-                            if not coach:
-                                continue
-                            
-                            if message_type == 'interactive':
-                                # Handle button clicks (Confirm/Edit)
-                                button_reply = message.get('interactive', {}).get('button_reply', {})
-                                button_id = button_reply.get('id', '')
-                                
-                                if button_id.startswith('confirm_'):
-                                    processing_id = button_id.replace('confirm_', '')
-                                    await handle_voice_confirmation(processing_id, True)
-                                elif button_id.startswith('edit_'):
-                                    processing_id = button_id.replace('edit_', '')
-                                    await handle_voice_confirmation(processing_id, False)
+                            if button_id.startswith('confirm_'):
+                                processing_id = button_id.replace('confirm_', '')
+                                await handle_voice_confirmation(processing_id, True)
+                            elif button_id.startswith('edit_'):
+                                processing_id = button_id.replace('edit_', '')
+                                await handle_voice_confirmation(processing_id, False)
+                        
+                        elif message_type == 'audio':
+                            # Handle voice messages
+                            audio_id = message.get('audio', {}).get('id')
+                            # Process voice message...
                             
-                            elif message_type == 'audio':
-                                # Handle voice messages
-                                audio_id = message.get('audio', {}).get('id')
-                                # Process voice message...
-                                
-                            elif message_type == 'text':
-                                # Handle text commands
-                                text_body = message.get('text', {}).get('body', '')
-                                await process_text_command(str(coach['id']), text_body)
-            
-            # Mark webhook as processed
+                        elif message_type == 'text':
+                            # Handle text commands
+                            text_body = message.get('text', {}).get('body', '')
+                            await process_text_command(str(coach['id']), text_body)
+        
+        # Mark webhook as processed
+        async with db.acquire() as conn:
             await conn.execute(
                 "UPDATE whatsapp_webhooks SET processing_status = 'processed' WHERE id = $1",
                 webhook_id
             )
     
     except Exception as e:
-        logger.error(f"Webhook processing error: {e}")
+        logger.exception(f"Webhook processing error: {e}")
 
 async def handle_voice_confirmation(processing_id: str, confirmed: bool):
     """Handle voice message confirmation"""
     try:
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             if confirmed:
                 # Mark as confirmed and use corrected text
                 await conn.execute(
@@ -1020,7 +1044,7 @@ async def handle_voice_confirmation(processing_id: str, confirmed: bool):
                 )
     
     except Exception as e:
-        logger.error(f"Voice confirmation error: {e}")
+        logger.exception(f"Voice confirmation error: {e}")
 
 async def process_text_command(coach_id: str, command_text: str):
     """Process natural language commands from WhatsApp"""
@@ -1060,37 +1084,37 @@ async def process_text_command(coach_id: str, command_text: str):
             pass
     
     except Exception as e:
-        logger.error(f"Command processing error: {e}")
+        logger.exception(f"Command processing error: {e}")
 
 async def send_google_sheet_to_coach(coach_id: str):
     """Send Google Sheet to coach via WhatsApp"""
     try:
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             # Get client data for export
             client_data = await conn.fetch(
                 "SELECT * FROM get_client_export_data($1)",
                 coach_id
             )
-            
-            # Update Google Sheet
-            sheet_id = await sheets_service.create_or_update_sheet(
-                coach_id, [dict(row) for row in client_data]
-            )
-            
-            # Get sheet URL
-            sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}"
-            
-            # Send to coach
             coach = await conn.fetchrow("SELECT * FROM coaches WHERE id = $1", coach_id)
-            whatsapp_client = WhatsAppClient(os.getenv("WHATSAPP_ACCESS_TOKEN"), os.getenv("WHATSAPP_PHONE_NUMBER_ID"))
-            
-            await whatsapp_client.send_text_message(
-                coach['whatsapp_phone_number'],
-                f"📊 Here's your updated client stats:\n{sheet_url}"
-            )
+        
+        # Update Google Sheet
+        sheet_id = await sheets_service.create_or_update_sheet(
+            coach_id, [dict(row) for row in client_data]
+        )
+        
+        # Get sheet URL
+        sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+        
+        # Send to coach
+        whatsapp_client = WhatsAppClient(os.getenv("WHATSAPP_ACCESS_TOKEN"), os.getenv("WHATSAPP_PHONE_NUMBER_ID"))
+        
+        await whatsapp_client.send_text_message(
+            coach['whatsapp_phone_number'],
+            f"📊 Here's your updated client stats:\n{sheet_url}"
+        )
     
     except Exception as e:
-        logger.error(f"Send stats error: {e}")
+        logger.exception(f"Send stats error: {e}")
 
 @router.get("/coaches/{coach_id}/categories")
 async def get_categories(coach_id: str):
@@ -1113,14 +1137,14 @@ async def get_categories(coach_id: str):
         return result
     
     except Exception as e:
-        logger.error(f"Get categories error: {e}")
+        logger.exception(f"Get categories error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch categories")
 
 @router.post("/coaches/{coach_id}/categories")
 async def add_custom_category(coach_id: str, category_data: CategoryCreate):
     """Add custom category for coach"""
     try:
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             category_id = await conn.fetchval(
                 "INSERT INTO categories (name, coach_id, is_predefined) VALUES ($1, $2, false) RETURNING id",
                 category_data.name, coach_id
@@ -1129,7 +1153,7 @@ async def add_custom_category(coach_id: str, category_data: CategoryCreate):
             return {"category_id": str(category_id), "status": "created"}
     
     except Exception as e:
-        logger.error(f"Add category error: {e}")
+        logger.exception(f"Add category error: {e}")
         raise HTTPException(status_code=500, detail="Failed to add category")
 
 @router.get("/coaches/{coach_id}/export")
@@ -1140,7 +1164,7 @@ async def export_to_google_sheets(coach_id: str):
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             # Get comprehensive client data
             client_data = await conn.fetch("""
                 SELECT 
@@ -1170,54 +1194,56 @@ async def export_to_google_sheets(coach_id: str):
                 GROUP BY c.id, c.name, c.phone_number, c.country, c.timezone, c.created_at, c.updated_at
                 ORDER BY c.name
             """, coach_id)
+        
+        # Format data for Google Sheets
+        formatted_data = []
+        for row in client_data:
+            formatted_data.append({
+                "name": row['name'],
+                "phone_number": row['phone_number'],
+                "country": row['country'],
+                "timezone": row['timezone'],
+                "categories": row['categories'].split(', ') if row['categories'] else [],
+                "goals_count": row['goals_count'],
+                "last_celebration_sent": row['last_celebration_sent'].isoformat() if row['last_celebration_sent'] else '',
+                "last_accountability_sent": row['last_accountability_sent'].isoformat() if row['last_accountability_sent'] else '',
+                "status": row['status'],
+                "created_at": row['created_at'].isoformat() if row['created_at'] else '',
+                "updated_at": row['updated_at'].isoformat() if row['updated_at'] else ''
+            })
+        
+        # Try to create/update Google Sheet
+        if sheets_service.is_available():
+            sheet_id = await sheets_service.create_or_update_sheet(coach_id, formatted_data)
             
-            # Format data for Google Sheets
-            formatted_data = []
-            for row in client_data:
-                formatted_data.append({
-                    "name": row['name'],
-                    "phone_number": row['phone_number'],
-                    "country": row['country'],
-                    "timezone": row['timezone'],
-                    "categories": row['categories'].split(', ') if row['categories'] else [],
-                    "goals_count": row['goals_count'],
-                    "last_celebration_sent": row['last_celebration_sent'].isoformat() if row['last_celebration_sent'] else '',
-                    "last_accountability_sent": row['last_accountability_sent'].isoformat() if row['last_accountability_sent'] else '',
-                    "status": row['status'],
-                    "created_at": row['created_at'].isoformat() if row['created_at'] else '',
-                    "updated_at": row['updated_at'].isoformat() if row['updated_at'] else ''
-                })
-            
-            # Try to create/update Google Sheet
-            if sheets_service.is_available():
-                sheet_id = await sheets_service.create_or_update_sheet(coach_id, formatted_data)
-                
-                if sheet_id:
-                    sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/edit"
-                    return {
-                        "status": "exported",
-                        "sheet_url": sheet_url,
-                        "sheet_id": sheet_id,
-                        "clients_count": len(formatted_data),
-                        "message": "Data successfully exported to Google Sheets"
-                    }
-                else:
-                    # Fallback to JSON if Google Sheets fails
-                    return {
-                        "status": "partial_export",
-                        "data": formatted_data,
-                        "message": "Google Sheets export failed, returning data as JSON"
-                    }
+            if sheet_id:
+                sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/edit"
+                return {
+                    "status": "exported",
+                    "sheet_url": sheet_url,
+                    "sheet_id": sheet_id,
+                    "clients_count": len(formatted_data),
+                    "message": "Data successfully exported to Google Sheets"
+                }
             else:
-                # Google Sheets not configured, return JSON
+                # Fallback to JSON if Google Sheets fails
                 return {
-                    "status": "json_export",
+                    "status": "partial_export",
                     "data": formatted_data,
-                    "message": "Google Sheets not configured, returning data as JSON"
+                    "message": "Google Sheets export failed, returning data as JSON"
                 }
+        else:
+            # Google Sheets not configured, return JSON
+            return {
+                "status": "json_export",
+                "data": formatted_data,
+                "message": "Google Sheets not configured, returning data as JSON"
+            }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Export error: {e}")
+        logger.exception(f"Export error: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 @router.get("/coaches/{coach_id}/stats")
@@ -1228,29 +1254,18 @@ async def get_coach_stats(coach_id: str):
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
-            # Get total clients
-            total_clients = await conn.fetchval(
-                "SELECT COUNT(*) FROM clients WHERE coach_id = $1 AND is_active = true",
-                coach_id
-            )
-            
-            # Get messages sent this month
-            messages_sent_month = await conn.fetchval(
-                """SELECT COUNT(*) FROM message_history 
-                   WHERE coach_id = $1 AND sent_at >= DATE_TRUNC('month', CURRENT_DATE)""",
-                coach_id
-            )
-            
-            # Get pending messages
-            pending_messages = await conn.fetchval(
-                "SELECT COUNT(*) FROM scheduled_messages WHERE coach_id = $1 AND status = 'scheduled'",
-                coach_id
-            )
-            
-            # Get active goals
-            active_goals = await conn.fetchval(
-                "SELECT COUNT(*) FROM goals g JOIN clients c ON g.client_id = c.id WHERE c.coach_id = $1 AND g.is_achieved = false",
+        async with db.acquire() as conn:
+            # All four counts in one statement: one round-trip, one connection
+            counts = await conn.fetchrow(
+                """SELECT
+                       (SELECT COUNT(*) FROM clients
+                        WHERE coach_id = $1 AND is_active = true) AS total_clients,
+                       (SELECT COUNT(*) FROM message_history
+                        WHERE coach_id = $1 AND sent_at >= DATE_TRUNC('month', CURRENT_DATE)) AS messages_sent_month,
+                       (SELECT COUNT(*) FROM scheduled_messages
+                        WHERE coach_id = $1 AND status = 'scheduled') AS pending_messages,
+                       (SELECT COUNT(*) FROM goals g JOIN clients c ON g.client_id = c.id
+                        WHERE c.coach_id = $1 AND g.is_achieved = false) AS active_goals""",
                 coach_id
             )
             
@@ -1263,17 +1278,19 @@ async def get_coach_stats(coach_id: str):
                    LIMIT 5""",
                 coach_id
             )
-            
-            return {
-                "total_clients": total_clients or 0,
-                "messages_sent_month": messages_sent_month or 0,
-                "pending_messages": pending_messages or 0,
-                "active_goals": active_goals or 0,
-                "recent_activity": [dict(row) for row in recent_activity]
-            }
+        
+        return {
+            "total_clients": counts['total_clients'] or 0,
+            "messages_sent_month": counts['messages_sent_month'] or 0,
+            "pending_messages": counts['pending_messages'] or 0,
+            "active_goals": counts['active_goals'] or 0,
+            "recent_activity": [dict(row) for row in recent_activity]
+        }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get coach stats error: {e}")
+        logger.exception(f"Get coach stats error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get coach stats: {str(e)}")
 
 @router.get("/coaches/{coach_id}/analytics")
@@ -1284,7 +1301,7 @@ async def get_coach_analytics(coach_id: str):
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             # Get message analytics by type
             message_analytics = await conn.fetch(
                 """SELECT message_type, COUNT(*) as count, 
@@ -1307,15 +1324,17 @@ async def get_coach_analytics(coach_id: str):
                    ORDER BY messages_received DESC""",
                 coach_id
             )
-            
-            return {
-                "message_analytics": [dict(row) for row in message_analytics],
-                "client_engagement": [dict(row) for row in client_engagement],
-                "total_clients": len(client_engagement)
-            }
+        
+        return {
+            "message_analytics": [dict(row) for row in message_analytics],
+            "client_engagement": [dict(row) for row in client_engagement],
+            "total_clients": len(client_engagement)
+        }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get coach analytics error: {e}")
+        logger.exception(f"Get coach analytics error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get coach analytics: {str(e)}")
 
 @router.get("/coaches/{coach_id}/goals")
@@ -1326,7 +1345,7 @@ async def get_coach_goals(coach_id: str):
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             goals = await conn.fetch(
                 """SELECT g.*, c.name as client_name, cat.name as category_name
                    FROM goals g
@@ -1339,45 +1358,47 @@ async def get_coach_goals(coach_id: str):
             
             return [dict(row) for row in goals]
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get coach goals error: {e}")
+        logger.exception(f"Get coach goals error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get coach goals: {str(e)}")
 
 @router.get("/coaches/{coach_id}/clients/{client_id}/can-send-free")
 async def can_send_free_message_to_client(coach_id: str, client_id: str):
     """Check if we can send a free message to a client (within 24h window)"""
     try:
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             # Get client phone number
             client = await conn.fetchrow(
                 "SELECT phone_number FROM clients WHERE id = $1 AND coach_id = $2 AND is_active = true",
                 client_id, coach_id
             )
-            
-            if not client:
-                raise HTTPException(status_code=404, detail="Client not found")
-            
-            # Clean phone number
-            clean_phone = ''.join(filter(str.isdigit, client['phone_number']))
-            
-            # Check if we can send free message
-            whatsapp_client = WhatsAppClient(
-                os.getenv("WHATSAPP_ACCESS_TOKEN"),
-                os.getenv("WHATSAPP_PHONE_NUMBER_ID")
-            )
-            
-            can_send_free = await whatsapp_client.can_send_free_message(clean_phone)
-            
-            return {
-                "can_send_free": can_send_free,
-                "client_id": client_id,
-                "phone_number": clean_phone
-            }
+        
+        if not client:
+            raise HTTPException(status_code=404, detail="Client not found")
+        
+        # Clean phone number
+        clean_phone = ''.join(filter(str.isdigit, client['phone_number']))
+        
+        # Check if we can send free message
+        whatsapp_client = WhatsAppClient(
+            os.getenv("WHATSAPP_ACCESS_TOKEN"),
+            os.getenv("WHATSAPP_PHONE_NUMBER_ID")
+        )
+        
+        can_send_free = await whatsapp_client.can_send_free_message(clean_phone)
+        
+        return {
+            "can_send_free": can_send_free,
+            "client_id": client_id,
+            "phone_number": clean_phone
+        }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Check free message eligibility error: {e}")
+        logger.exception(f"Check free message eligibility error: {e}")
         raise HTTPException(status_code=500, detail="Failed to check message eligibility")
 
 @router.get("/coaches/{coach_id}/scheduled-messages")
@@ -1388,7 +1409,7 @@ async def get_scheduled_messages(coach_id: str):
         if not hasattr(db, 'pool') or db.pool is None:
             raise HTTPException(status_code=500, detail="Database not connected")
         
-        async with db.pool.acquire() as conn:
+        async with db.acquire() as conn:
             messages = await conn.fetch(
                 """SELECT sm.*, c.name as client_name
                    FROM scheduled_messages sm
@@ -1400,8 +1421,10 @@ async def get_scheduled_messages(coach_id: str):
             
             return [dict(row) for row in messages]
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get scheduled messages error: {e}")
+        logger.exception(f"Get scheduled messages error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get scheduled messages: {str(e)}")
 
 # Scheduler service (would run as separate service in production)
@@ -1424,7 +1447,7 @@ class MessageScheduler:
                 logger.warning("Database pool not available, skipping message processing")
                 return
                 
-            async with db.pool.acquire() as conn:
+            async with db.acquire() as conn:
                 # Get messages due to be sent
                 due_messages = await conn.fetch(
                     """SELECT sm.*, c.phone_number, co.whatsapp_token, co.whatsapp_phone_number
@@ -1433,25 +1456,27 @@ class MessageScheduler:
                        JOIN coaches co ON sm.coach_id = co.id
                        WHERE sm.status = 'scheduled' 
                        AND sm.scheduled_time <= $1""",
-                    datetime.now()
+                    datetime.now(timezone.utc)
+                )
+            
+            # Send outside the connection so the pool isn't held during API calls
+            for message in due_messages:
+                # Send message
+                whatsapp_client = WhatsAppClient(
+                    os.getenv("WHATSAPP_ACCESS_TOKEN"),
+                    os.getenv("WHATSAPP_PHONE_NUMBER_ID")
                 )
                 
-                for message in due_messages:
-                    # Send message
-                    whatsapp_client = WhatsAppClient(
-                        os.getenv("WHATSAPP_ACCESS_TOKEN"),
-                        os.getenv("WHATSAPP_PHONE_NUMBER_ID")
-                    )
-                    
-                    result = await whatsapp_client.send_text_message(
-                        message['phone_number'],
-                        message['content']
-                    )
-                    
+                result = await whatsapp_client.send_text_message(
+                    message['phone_number'],
+                    message['content']
+                )
+                
+                async with db.acquire() as conn:
                     # Update status
                     await conn.execute(
                         "UPDATE scheduled_messages SET status = 'sent', sent_at = $1 WHERE id = $2",
-                        datetime.now(), message['id']
+                        datetime.now(timezone.utc), message['id']
                     )
                     
                     # Create history record
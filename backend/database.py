@@ -4,11 +4,17 @@ Database connection and management module
 
 import asyncpg
 import os
+import time
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Connections held longer than this are logged; a long hold usually means an
+# external HTTP call (WhatsApp, OpenAI, Google) is awaited while checked out
+SLOW_HOLD_THRESHOLD_MS = float(os.getenv("DB_SLOW_HOLD_MS", 100))
+
 class Database:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
@@ -26,7 +32,15 @@ class Database:
             db_user = os.getenv("DB_USER", "postgres")
             db_name = os.getenv("DB_NAME", "coaching_system")
             
+            # Pool sizing - defaults sized for concurrent onboarding/messaging bursts
+            min_size = int(os.getenv("DB_POOL_MIN_SIZE", 10))
+            max_size = int(os.getenv("DB_POOL_MAX_SIZE", 50))
+            max_queries = int(os.getenv("DB_POOL_MAX_QUERIES", 50000))
+            max_inactive_lifetime = float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", 300))
+            command_timeout = float(os.getenv("DB_COMMAND_TIMEOUT", 60))
+            
             logger.info(f"Connecting to database: {db_user}@{db_host}:{db_port}/{db_name}")
+            logger.info(f"Pool config: min_size={min_size}, max_size={max_size}, command_timeout={command_timeout}s")
             
             self.pool = await asyncpg.create_pool(
                 host=db_host,
@@ -34,9 +48,11 @@ class Database:
                 user=db_user,
                 password=db_password,
                 database=db_name,
-                min_size=5,
-                max_size=20,
-                command_timeout=60
+                min_size=min_size,
+                max_size=max_size,
+                max_queries=max_queries,
+                max_inactive_connection_lifetime=max_inactive_lifetime,
+                command_timeout=command_timeout
             )
             
             # Test the connection
@@ -54,6 +70,20 @@ class Database:
             await self.pool.close()
             logger.info("Database connection pool closed")
     
+    @asynccontextmanager
+    async def acquire(self):
+        """Acquire a pooled connection, warning if it is held too long"""
+        if not self.pool:
+            raise Exception("Database not connected")
+        async with self.pool.acquire() as connection:
+            start = time.perf_counter()
+            try:
+                yield connection
+            finally:
+                held_ms = (time.perf_counter() - start) * 1000
+                if held_ms > SLOW_HOLD_THRESHOLD_MS:
+                    logger.warning(f"Database connection held for {held_ms:.0f}ms (threshold {SLOW_HOLD_THRESHOLD_MS:.0f}ms)")
+    
     async def execute(self, query: str, *args):
         """Execute a query without returning results"""
         if not self.pool:
@@ -8,30 +8,26 @@ async def check_database():
             print("🔍 Checking database structure...\n")
             
             # Check if tables exist
-            cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = await cursor.fetchall()
+            tables = await db.execute_fetchall("SELECT name FROM sqlite_master WHERE type='table'")
             print("📋 Tables:")
             for table in tables:
                 print(f"  - {table[0]}")
             
             # Check coaches table structure
             print("\n👨‍💼 Coaches table structure:")
-            cursor = await db.execute("PRAGMA table_info(coaches)")
-            columns = await cursor.fetchall()
+            columns = await db.execute_fetchall("PRAGMA table_info(coaches)")
             for col in columns:
                 print(f"  - {col[1]} ({col[2]})")
             
             # Check categories
             print("\n📂 Categories in database:")
-            cursor = await db.execute("SELECT id, name, is_predefined FROM categories LIMIT 10")
-            categories = await cursor.fetchall()
+            categories = await db.execute_fetchall("SELECT id, name, is_predefined FROM categories LIMIT 10")
             for cat in categories:
                 print(f"  - {cat[1]} (ID: {cat[0]}, Predefined: {cat[2]})")
                 
             # Check clients table
             print("\n👥 Clients table structure:")
-            cursor = await db.execute("PRAGMA table_info(clients)")
-            columns = await cursor.fetchall()
+            columns = await db.execute_fetchall("PRAGMA table_info(clients)")
             for col in columns:
                 print(f"  - {col[1]} ({col[2]})")
                 
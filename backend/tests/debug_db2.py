@@ -15,19 +15,17 @@ async def test_client_add():
             
             # Test category lookup
             print("\n🔍 Testing category lookup:")
-            cursor = await db.execute(
-                "SELECT id FROM categories WHERE name = ? AND (is_predefined = 1 OR coach_id = ?)",
-                ("Health", "test-coach-id")
+            lookup_names = ("Health", "Finance")
+            rows = await db.execute_fetchall(
+                f"""SELECT name, id FROM categories
+                    WHERE name IN ({", ".join("?" * len(lookup_names))})
+                    AND (is_predefined = 1 OR coach_id = ?)""",
+                (*lookup_names, "test-coach-id")
             )
-            result = await cursor.fetchone()
-            print(f"Health category lookup: {result}")
-            
-            cursor = await db.execute(
-                "SELECT id FROM categories WHERE name = ? AND (is_predefined = 1 OR coach_id = ?)",
-                ("Finance", "test-coach-id")
-            )
-            result = await cursor.fetchone()
-            print(f"Finance category lookup: {result}")
+            category_ids = {name: category_id for name, category_id in rows}
+            for name in lookup_names:
+                result = (category_ids[name],) if name in category_ids else None
+                print(f"{name} category lookup: {result}")
             
             # Check existing clients
             print("\n👥 Existing clients:")
@@ -0,0 +1,13 @@
+"""
+Shared httpx settings for the endpoint test scripts
+"""
+
+import httpx
+
+# The scripts send at most three requests at once (their asyncio.gather
+# groups), so a small keep-alive pool reused across steps is enough
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=4, max_connections=4, keepalive_expiry=30)
+
+def make_transport() -> httpx.AsyncHTTPTransport:
+    """Pooled transport that retries a failed connect once (e.g. server still starting up)"""
+    return httpx.AsyncHTTPTransport(retries=1, limits=HTTP_LIMITS)
@@ -1,13 +1,15 @@
 import asyncio
 import httpx
 import json
-from datetime import datetime
+import time
+
+from http_helpers import make_transport
 
 API_BASE = "http://localhost:8000"
 
 async def test_all_endpoints():
     """Test all available endpoints comprehensively"""
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=30.0, transport=make_transport()) as client:
         print("🚀 Comprehensive Backend Testing\n")
         
         # Step 1: Basic connectivity
@@ -19,17 +21,32 @@ async def test_all_endpoints():
             print(f"❌ Root failed: {e}")
             return
         
-        try:
-            response = await client.get(f"{API_BASE}/docs")
-            print(f"✅ API Docs: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Docs failed: {e}")
+        # Docs, schema and health are independent - probe them concurrently.
+        # Fetching /openapi.json also warms FastAPI's one-time schema build
+        # so it doesn't land on a later request
+        docs_response, schema_response, health_response = await asyncio.gather(
+            client.get(f"{API_BASE}/docs"),
+            client.get(f"{API_BASE}/openapi.json"),
+            client.get(f"{API_BASE}/health"),
+            return_exceptions=True
+        )
+        
+        if isinstance(docs_response, Exception):
+            print(f"❌ Docs failed: {docs_response}")
+        else:
+            print(f"✅ API Docs: {docs_response.status_code}")
+        
+        if isinstance(schema_response, Exception):
+            print(f"❌ OpenAPI schema failed: {schema_response}")
+        else:
+            print(f"✅ OpenAPI schema: {schema_response.status_code}")
         
         # Step 2: Health check
         print("\n2. HEALTH CHECK")
         try:
-            response = await client.get(f"{API_BASE}/health")
-            print(f"✅ Health: {response.status_code} - {response.json()}")
+            if isinstance(health_response, Exception):
+                raise health_response
+            print(f"✅ Health: {health_response.status_code} - {health_response.json()}")
         except Exception as e:
             print(f"❌ Health failed: {e}")
         
@@ -151,7 +168,7 @@ async def test_all_endpoints():
                         "messages": [{
                             "from": "+1555000COMP",
                             "text": {"body": "Test webhook message"},
-                            "timestamp": str(int(datetime.now().timestamp())),
+                            "timestamp": str(int(time.time())),
                             "type": "text"
                         }]
                     }
@@ -169,26 +186,21 @@ async def test_all_endpoints():
         # Step 9: Additional endpoints
         print(f"\n9. ADDITIONAL ENDPOINTS")
         
-        # 9a. Coach stats
-        try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/stats")
-            print(f"✅ Coach stats: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Coach stats: {e}")
-        
-        # 9b. Export endpoint
-        try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/export")
-            print(f"✅ Export: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Export: {e}")
-        
-        # 9c. Analytics
-        try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/analytics")
-            print(f"✅ Analytics: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Analytics: {e}")
+        # 9a-9c. Coach stats, export and analytics are read-only - run them concurrently
+        additional = [
+            ("Coach stats", f"{API_BASE}/coaches/{coach_id}/stats"),
+            ("Export", f"{API_BASE}/coaches/{coach_id}/export"),
+            ("Analytics", f"{API_BASE}/coaches/{coach_id}/analytics"),
+        ]
+        responses = await asyncio.gather(
+            *(client.get(url) for _, url in additional),
+            return_exceptions=True
+        )
+        for (label, _), response in zip(additional, responses):
+            if isinstance(response, Exception):
+                print(f"❌ {label}: {response}")
+            else:
+                print(f"✅ {label}: {response.status_code}")
         
         print("\n🎉 Comprehensive testing completed!")
         print(f"📊 Coach ID for further testing: {coach_id}")
@@ -3,11 +3,13 @@ import httpx
 import json
 import random
 
+from http_helpers import make_transport
+
 API_BASE = "http://localhost:8000"
 
 async def test_crud_operations():
     """Test Create, Read, Update, Delete operations"""
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(timeout=30.0, transport=make_transport()) as client:
         print("🧪 Testing CRUD Operations\n")
         
         # Step 1: Create a new coach
@@ -45,10 +47,18 @@ async def test_crud_operations():
             }
         ]
         
+        # The clients are independent, so create them concurrently
+        responses = await asyncio.gather(
+            *(client.post(f"{API_BASE}/coaches/{coach_id}/clients", json=client_data)
+              for client_data in clients_to_create),
+            return_exceptions=True
+        )
+        
         client_ids = []
-        for client_data in clients_to_create:
+        for client_data, response in zip(clients_to_create, responses):
             try:
-                response = await client.post(f"{API_BASE}/coaches/{coach_id}/clients", json=client_data)
+                if isinstance(response, Exception):
+                    raise response
                 if response.status_code == 200:
                     result = response.json()
                     client_ids.append(result['client_id'])
@@ -58,22 +68,31 @@ async def test_crud_operations():
             except Exception as e:
                 print(f"❌ Error creating client {client_data['name']}: {e}")
         
+        # Steps 3 and 4 are both reads - fetch them together
+        clients_response, categories_response = await asyncio.gather(
+            client.get(f"{API_BASE}/coaches/{coach_id}/clients"),
+            client.get(f"{API_BASE}/coaches/{coach_id}/categories"),
+            return_exceptions=True
+        )
+        
         # Step 3: Read - Get all clients
         print(f"\n3. READ - Get all clients for coach {coach_id}")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/clients")
-            clients = response.json()
+            if isinstance(clients_response, Exception):
+                raise clients_response
+            clients = clients_response.json()
             print(f"✅ Retrieved {len(clients)} clients:")
-            for client in clients:
-                print(f"   - {client['name']} ({client['phone_number']})")
+            for c in clients:
+                print(f"   - {c['name']} ({c['phone_number']})")
         except Exception as e:
             print(f"❌ Error getting clients: {e}")
             
         # Step 4: Read - Get categories
         print(f"\n4. READ - Get categories for coach {coach_id}")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/categories")
-            categories = response.json()
+            if isinstance(categories_response, Exception):
+                raise categories_response
+            categories = categories_response.json()
             print(f"✅ Retrieved {len(categories)} categories:")
             for cat in categories[:5]:  # Show first 5
                 print(f"   - {cat['name']} (Predefined: {cat['is_predefined']})")
@@ -130,8 +149,8 @@ async def test_crud_operations():
             response = await client.get(f"{API_BASE}/coaches/{coach_id}/clients")
             clients = response.json()
             print(f"✅ Final count: {len(clients)} clients")
-            for client in clients:
-                print(f"   - {client['name']} ({client['phone_number']})")
+            for c in clients:
+                print(f"   - {c['name']} ({c['phone_number']})")
         except Exception as e:
             print(f"❌ Error in final verification: {e}")
         
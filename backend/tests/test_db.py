@@ -7,17 +7,21 @@ load_dotenv()
 
 async def test_connection():
     try:
-        conn = await asyncpg.connect(
-            host='localhost',
-            port=5432,
-            user='postgres',
-            password='password123',
-            database='coaching_system'
+        # Same pooled acquire path the app uses (backend/database.py), kept small
+        pool = await asyncpg.create_pool(
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=int(os.getenv('DB_PORT', 5432)),
+            user=os.getenv('DB_USER', 'postgres'),
+            password=os.getenv('DB_PASSWORD', 'password123'),
+            database=os.getenv('DB_NAME', 'coaching_system'),
+            min_size=1,
+            max_size=2
         )
         print('Connected successfully!')
-        version = await conn.fetchval('SELECT version()')
+        async with pool.acquire() as conn:
+            version = await conn.fetchval('SELECT version()')
         print(f'PostgreSQL version: {version}')
-        await conn.close()
+        await pool.close()
     except Exception as e:
         print(f'Connection failed: {e}')
 
@@ -1,20 +1,40 @@
 import asyncio
 import httpx
 import json
-from datetime import datetime
+import time
+
+from http_helpers import make_transport
 
 # API Base URL
 API_BASE = "http://localhost:8000"
 
+def _unwrap(result):
+    """Re-raise an exception captured by asyncio.gather(return_exceptions=True)"""
+    if isinstance(result, Exception):
+        raise result
+    return result
+
 async def test_endpoints():
     """Comprehensive test of all API endpoints"""
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(
+        base_url=API_BASE,
+        transport=make_transport(),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    ) as client:
         print("🚀 Starting comprehensive API testing...\n")
         
+        # Tests 1-3 have no dependencies - issue them together
+        root_result, docs_result, health_result = await asyncio.gather(
+            client.get("/"),
+            client.get("/docs"),
+            client.get("/health"),
+            return_exceptions=True
+        )
+        
         # Test 1: Root endpoint
         print("1. Testing root endpoint...")
         try:
-            response = await client.get(f"{API_BASE}/")
+            response = _unwrap(root_result)
             print(f"✅ Root: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Root failed: {e}")
@@ -22,7 +42,7 @@ async def test_endpoints():
         # Test 2: API docs
         print("\n2. Testing API documentation...")
         try:
-            response = await client.get(f"{API_BASE}/docs")
+            response = _unwrap(docs_result)
             print(f"✅ Docs: {response.status_code} - Documentation available")
         except Exception as e:
             print(f"❌ Docs failed: {e}")
@@ -30,7 +50,7 @@ async def test_endpoints():
         # Test 3: Health endpoint (from additional_backend_endpoints)
         print("\n3. Testing health endpoint...")
         try:
-            response = await client.get(f"{API_BASE}/health")
+            response = _unwrap(health_result)
             print(f"✅ Health: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Health failed: {e}")
@@ -45,7 +65,7 @@ async def test_endpoints():
             "timezone": "EST"
         }
         try:
-            response = await client.post(f"{API_BASE}/register", json=registration_data)
+            response = await client.post("/register", json=registration_data)
             result = response.json()
             print(f"✅ Registration: {response.status_code} - {result}")
             
@@ -56,11 +76,19 @@ async def test_endpoints():
         except Exception as e:
             print(f"❌ Registration failed: {e}")
             return
+        
+        # Tests 5, 8 and 9 only need the coach - fetch them before adding a client
+        clients_result, categories_result, templates_result = await asyncio.gather(
+            client.get(f"/coaches/{coach_id}/clients"),
+            client.get(f"/coaches/{coach_id}/categories"),
+            client.get(f"/coaches/{coach_id}/templates?type=celebration"),
+            return_exceptions=True
+        )
             
         # Test 5: Get clients for coach
         print("\n5. Testing get clients...")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/clients")
+            response = _unwrap(clients_result)
             clients = response.json()
             print(f"✅ Get clients: {response.status_code} - Found {len(clients)} clients")
         except Exception as e:
@@ -76,7 +104,7 @@ async def test_endpoints():
             "categories": ["Health", "Finance"]
         }
         try:
-            response = await client.post(f"{API_BASE}/coaches/{coach_id}/clients", json=client_data)
+            response = await client.post(f"/coaches/{coach_id}/clients", json=client_data)
             print(f"✅ Add client: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Add client failed: {e}")
@@ -84,7 +112,7 @@ async def test_endpoints():
         # Test 7: Get clients again (should show the new client)
         print("\n7. Testing get clients after adding...")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/clients")
+            response = await client.get(f"/coaches/{coach_id}/clients")
             clients = response.json()
             print(f"✅ Get clients updated: {response.status_code} - Found {len(clients)} clients")
             if clients:
@@ -96,7 +124,7 @@ async def test_endpoints():
         # Test 8: Categories endpoint
         print("\n8. Testing get categories...")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/categories")
+            response = _unwrap(categories_result)
             categories = response.json()
             print(f"✅ Get categories: {response.status_code} - Found {len(categories)} categories")
         except Exception as e:
@@ -105,7 +133,7 @@ async def test_endpoints():
         # Test 9: Message templates
         print("\n9. Testing message templates...")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}/templates?type=celebration")
+            response = _unwrap(templates_result)
             templates = response.json()
             print(f"✅ Get templates: {response.status_code} - Found {len(templates)} templates")
         except Exception as e:
@@ -120,7 +148,7 @@ async def test_endpoints():
             "schedule_type": "now"
         }
         try:
-            response = await client.post(f"{API_BASE}/messages/send", json=message_data)
+            response = await client.post("/messages/send", json=message_data)
             print(f"✅ Send message: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Send message failed: {e}")
@@ -140,7 +168,7 @@ async def test_endpoints():
                                     {
                                         "from": "+1234567890",
                                         "text": {"body": "Hello coach!"},
-                                        "timestamp": str(int(datetime.now().timestamp())),
+                                        "timestamp": str(int(time.time())),
                                         "type": "text"
                                     }
                                 ]
@@ -151,15 +179,22 @@ async def test_endpoints():
             ]
         }
         try:
-            response = await client.post(f"{API_BASE}/webhook/whatsapp", json=webhook_data)
+            response = await client.post("/webhook/whatsapp", json=webhook_data)
             print(f"✅ WhatsApp webhook: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ WhatsApp webhook failed: {e}")
+        
+        # Tests 12 and 13 are independent reads
+        stats_result, profile_result = await asyncio.gather(
+            client.get("/stats"),
+            client.get(f"/coaches/{coach_id}"),
+            return_exceptions=True
+        )
             
         # Test 12: Stats endpoint
         print("\n12. Testing stats endpoint...")
         try:
-            response = await client.get(f"{API_BASE}/stats")
+            response = _unwrap(stats_result)
             print(f"✅ Stats: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Stats failed: {e}")
@@ -167,7 +202,7 @@ async def test_endpoints():
         # Test 13: Coach profile
         print("\n13. Testing get coach profile...")
         try:
-            response = await client.get(f"{API_BASE}/coaches/{coach_id}")
+            response = _unwrap(profile_result)
             print(f"✅ Coach profile: {response.status_code} - {response.json()}")
         except Exception as e:
             print(f"❌ Coach profile failed: {e}")
@@ -8,6 +8,8 @@ import httpx
 import os
 from datetime import datetime
 
+from http_helpers import make_transport
+
 # Load real environment variables
 from dotenv import load_dotenv
 load_dotenv('.env.production')
@@ -17,9 +19,17 @@ TEST_PHONE = "+1234567890"  # Replace with your real phone number
 
 async def test_real_integration():
     """Test complete workflow with real APIs"""
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    async with httpx.AsyncClient(
+        base_url=API_BASE,
+        transport=make_transport(),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    ) as client:
         print("📱 Testing Real Integration with Your Phone Number\n")
         
+        # Warm-up: open the pooled connection (DNS + TCP + TLS) on a cheap
+        # request so the registration below doesn't carry the handshake
+        await client.get("/health")
+        
         # Step 1: Register as coach
         print("1. COACH REGISTRATION")
         coach_data = {
@@ -30,7 +40,7 @@ async def test_real_integration():
             "timezone": "EST"
         }
         
-        response = await client.post(f"{API_BASE}/register", json=coach_data)
+        response = await client.post("/register", json=coach_data)
         result = response.json()
         coach_id = result['coach_id']
         print(f"✅ Coach registered: {coach_id}")
@@ -45,7 +55,7 @@ async def test_real_integration():
             "categories": ["Health", "Business", "Growth"]
         }
         
-        response = await client.post(f"{API_BASE}/coaches/{coach_id}/clients", json=client_data)
+        response = await client.post(f"/coaches/{coach_id}/clients", json=client_data)
         print(f"✅ Client added: {response.status_code}")
         
         # Step 3: Send real WhatsApp message
@@ -57,13 +67,13 @@ async def test_real_integration():
             "schedule_type": "now"
         }
         
-        response = await client.post(f"{API_BASE}/messages/send", json=message_data)
+        response = await client.post("/messages/send", json=message_data)
         print(f"✅ Message sent: {response.status_code}")
         print("📱 Check your WhatsApp for the test message!")
         
         # Step 4: Test Google Sheets export
         print(f"\n4. TESTING GOOGLE SHEETS EXPORT")
-        response = await client.get(f"{API_BASE}/coaches/{coach_id}/export")
+        response = await client.get(f"/coaches/{coach_id}/export")
         if response.status_code == 200:
             result = response.json()
             print(f"✅ Google Sheets export: {result.get('sheet_url', 'URL not provided')}")
@@ -79,12 +89,12 @@ async def test_real_integration():
             "target_clients": ["all"]
         }
         
-        response = await client.post(f"{API_BASE}/voice/process", json=voice_data)
+        response = await client.post("/voice/process", json=voice_data)
         print(f"✅ Voice processing: {response.status_code}")
         
         # Step 6: Check analytics
         print(f"\n6. CHECKING ANALYTICS")
-        response = await client.get(f"{API_BASE}/coaches/{coach_id}/analytics")
+        response = await client.get(f"/coaches/{coach_id}/analytics")
         if response.status_code == 200:
             analytics = response.json()
             print(f"✅ Analytics: {analytics}")
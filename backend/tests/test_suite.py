@@ -11,7 +11,7 @@ import json
 import os
 from unittest.mock import patch, AsyncMock, MagicMock
 from datetime import datetime, timedelta
-import tempfile
+from io import BytesIO
 import pandas as pd
 
 # Test configuration
@@ -27,17 +27,65 @@ TEST_CONFIG = {
 }
 
 # Test fixtures
+@pytest.fixture(scope="session")
+def event_loop():
+    """Share one event loop across the session so session-scoped async fixtures work.
+    
+    Uses uvloop (installed with uvicorn[standard]) where available; it is
+    not built for Windows, so fall back to the default loop there.
+    """
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+async def db_pool():
+    """Create one test database pool for the whole session"""
+    pool = await asyncpg.create_pool(min_size=2, max_size=10, **TEST_CONFIG["DB_CONFIG"])
+    yield pool
+    await pool.close()
+
 @pytest.fixture
-async def db_conn():
-    """Create test database connection"""
-    conn = await asyncpg.connect(**TEST_CONFIG["DB_CONFIG"])
-    yield conn
-    await conn.close()
+async def db_conn(db_pool):
+    """Borrow a pooled test database connection.
+    
+    Writes are committed, not rolled back: the API under test uses its own
+    pool and must be able to see fixture rows.
+    """
+    async with db_pool.acquire() as conn:
+        yield conn
+
+@pytest.fixture(scope="session")
+async def asgi_app():
+    """Run the FastAPI app in-process against the test database.
+    
+    ASGITransport doesn't fire startup/shutdown events, so the app's
+    pool is connected here, pointed at TEST_CONFIG's database.
+    """
+    from backend.main import app
+    from backend.database import db
+    
+    db_config = TEST_CONFIG["DB_CONFIG"]
+    with patch.dict(os.environ, {
+        "DB_HOST": db_config["host"],
+        "DB_PORT": str(db_config["port"]),
+        "DB_USER": db_config["user"],
+        "DB_PASSWORD": db_config["password"],
+        "DB_NAME": db_config["database"]
+    }):
+        await db.connect()
+    yield app
+    await db.disconnect()
 
 @pytest.fixture
-async def api_client():
-    """Create test API client"""
-    async with httpx.AsyncClient(base_url=TEST_CONFIG["API_BASE"]) as client:
+async def api_client(asgi_app):
+    """Create test API client that calls the app in-process (no sockets)"""
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url=TEST_CONFIG["API_BASE"]) as client:
         yield client
 
 @pytest.fixture
@@ -53,6 +101,29 @@ async def test_coach(db_conn):
     # Cleanup
     await db_conn.execute("DELETE FROM coaches WHERE id = $1", coach_id)
 
+@pytest.fixture(scope="session")
+def csv_import_bytes():
+    """CSV upload payload, built once per session"""
+    return b"""name,phone_number,country,timezone,categories
+John Doe,+1111111111,USA,EST,"Health,Finance"
+Jane Smith,+2222222222,Canada,PST,"Business,Growth"
+Bob Johnson,+3333333333,USA,CST,"Health"
+"""
+
+@pytest.fixture(scope="session")
+def xlsx_import_bytes():
+    """Excel upload payload, encoded in memory once per session"""
+    df = pd.DataFrame({
+        'name': ['Excel Client 1', 'Excel Client 2'],
+        'phone_number': ['+4444444444', '+5555555555'],
+        'country': ['USA', 'UK'],
+        'timezone': ['EST', 'GMT'],
+        'categories': ['Health,Business', 'Finance']
+    })
+    buf = BytesIO()
+    df.to_excel(buf, index=False)
+    return buf.getvalue()
+
 @pytest.fixture
 async def test_client(db_conn, test_coach):
     """Create test client"""
@@ -64,6 +135,20 @@ async def test_client(db_conn, test_coach):
     )
     yield str(client_id)
 
+@pytest.fixture
+async def bulk_clients(db_conn, test_coach):
+    """Create three test clients in a single INSERT"""
+    names = [f"Bulk Test Client {i}" for i in range(3)]
+    phones = [f"+155566677{i}" for i in range(3)]
+    rows = await db_conn.fetch(
+        """INSERT INTO clients (coach_id, name, phone_number, country, timezone)
+           SELECT $1, v.name, v.phone, 'USA', 'EST'
+           FROM unnest($2::text[], $3::text[]) AS v(name, phone)
+           RETURNING id""",
+        test_coach, names, phones
+    )
+    yield [str(row["id"]) for row in rows]
+
 class TestCoachRegistration:
     """Test coach registration and authentication"""
     
@@ -220,33 +305,18 @@ class TestMessageOperations:
         assert data["status"] == "scheduled"
     
     @pytest.mark.asyncio
-    async def test_bulk_message_sending(self, api_client, test_coach):
+    async def test_bulk_message_sending(self, api_client, test_coach, bulk_clients):
         """Test bulk message operations"""
-        # Create multiple test clients
-        client_ids = []
-        for i in range(3):
-            client_data = {
-                "name": f"Bulk Test Client {i}",
-                "phone_number": f"+155566677{i}",
-                "country": "USA",
-                "timezone": "EST",
-                "categories": ["Health"]
-            }
-            
-            response = await api_client.post(f"/coaches/{test_coach}/clients", json=client_data)
-            client_id = response.json()["client_id"]
-            client_ids.append(client_id)
-        
         # Send bulk message
         bulk_data = {
-            "client_ids": client_ids,
+            "client_ids": bulk_clients,
             "content": "Bulk test message for everyone!",
             "message_type": "general",
             "schedule_type": "now"
         }
         
         with patch('worker.WhatsAppClient.send_message') as mock_send:
-            mock_send.return_value = {"messages": [{"id": f"bulk_msg_{i}"}]}
+            mock_send.return_value = {"messages": [{"id": "bulk_msg_id"}]}
             
             response = await api_client.post(f"/coaches/{test_coach}/bulk-message", json=bulk_data)
             assert response.status_code == 200
@@ -324,6 +394,20 @@ class TestWhatsAppIntegration:
             assert response.status_code == 200
             assert response.text == "test_challenge_12345"
     
+    @pytest.mark.asyncio
+    async def test_webhook_verification_without_token(self, api_client):
+        """Test webhook verification is refused when WEBHOOK_VERIFY_TOKEN is unset"""
+        params = {
+            "hub.mode": "subscribe",
+            "hub.challenge": "test_challenge_12345",
+            "hub.verify_token": "test_verify_token"
+        }
+        
+        with patch.dict(os.environ):
+            os.environ.pop("WEBHOOK_VERIFY_TOKEN", None)
+            response = await api_client.get("/webhook/whatsapp", params=params)
+            assert response.status_code == 403
+    
     @pytest.mark.asyncio
     async def test_webhook_message_processing(self, api_client, test_coach):
         """Test processing incoming WhatsApp messages"""
@@ -410,70 +494,34 @@ class TestFileImport:
     """Test file import functionality"""
     
     @pytest.mark.asyncio
-    async def test_csv_import(self, api_client, test_coach):
+    async def test_csv_import(self, api_client, test_coach, csv_import_bytes):
         """Test CSV file import"""
-        # Create test CSV
-        csv_data = """name,phone_number,country,timezone,categories
-John Doe,+1111111111,USA,EST,"Health,Finance"
-Jane Smith,+2222222222,Canada,PST,"Business,Growth"
-Bob Johnson,+3333333333,USA,CST,"Health"
-"""
+        files = {"file": ("test_clients.csv", BytesIO(csv_import_bytes), "text/csv")}
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            f.write(csv_data)
-            temp_path = f.name
-        
-        try:
-            # Upload file
-            with open(temp_path, 'rb') as f:
-                files = {"file": ("test_clients.csv", f, "text/csv")}
-                
-                response = await api_client.post(
-                    f"/coaches/{test_coach}/import-clients",
-                    files=files
-                )
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert data["status"] == "success"
-                assert data["count"] == 3
+        response = await api_client.post(
+            f"/coaches/{test_coach}/import-clients",
+            files=files
+        )
         
-        finally:
-            os.unlink(temp_path)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["count"] == 3
     
     @pytest.mark.asyncio
-    async def test_excel_import(self, api_client, test_coach):
+    async def test_excel_import(self, api_client, test_coach, xlsx_import_bytes):
         """Test Excel file import"""
-        # Create test Excel file
-        df = pd.DataFrame({
-            'name': ['Excel Client 1', 'Excel Client 2'],
-            'phone_number': ['+4444444444', '+5555555555'],
-            'country': ['USA', 'UK'],
-            'timezone': ['EST', 'GMT'],
-            'categories': ['Health,Business', 'Finance']
-        })
-        
-        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as f:
-            df.to_excel(f.name, index=False)
-            temp_path = f.name
+        files = {"file": ("test_clients.xlsx", BytesIO(xlsx_import_bytes), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
         
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {"file": ("test_clients.xlsx", f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
-                
-                response = await api_client.post(
-                    f"/coaches/{test_coach}/import-clients",
-                    files=files
-                )
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert data["status"] == "success"
-                assert data["count"] == 2
+        response = await api_client.post(
+            f"/coaches/{test_coach}/import-clients",
+            files=files
+        )
         
-        finally:
-            os.unlink(temp_path)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["count"] == 2
 
 class TestGoogleSheetsIntegration:
     """Test Google Sheets integration"""
@@ -608,18 +656,24 @@ class TestIntegrationWorkflows:
         assert reg_response.status_code == 200
         coach_id = reg_response.json()["coach_id"]
         
-        # Step 2: Add clients
-        clients = []
-        for i in range(2):
-            client_data = {
+        # Step 2: Add clients (independent, so created concurrently)
+        client_data_list = [
+            {
                 "name": f"Integration Client {i}",
                 "phone_number": f"+199999999{i}",
                 "country": "USA",
                 "timezone": "EST",
                 "categories": ["Health", "Business"]
             }
-            
-            client_response = await api_client.post(f"/coaches/{coach_id}/clients", json=client_data)
+            for i in range(2)
+        ]
+        
+        client_responses = await asyncio.gather(*[
+            api_client.post(f"/coaches/{coach_id}/clients", json=client_data)
+            for client_data in client_data_list
+        ])
+        clients = []
+        for client_response in client_responses:
             assert client_response.status_code == 200
             clients.append(client_response.json()["client_id"])
         
@@ -673,26 +727,23 @@ class TestPerformance:
         assert success_count >= 45
     
     @pytest.mark.asyncio
-    async def test_large_client_list_performance(self, api_client, test_coach):
+    async def test_large_client_list_performance(self, api_client, db_conn, test_coach):
         """Test performance with large client lists"""
         import time
         
-        # Add 100 clients
+        # Add 100 clients in one COPY - this test is about listing, and
+        # single-client creation is already covered by TestClientManagement
         start_time = time.time()
         
-        client_ids = []
-        for i in range(100):
-            client_data = {
-                "name": f"Performance Client {i}",
-                "phone_number": f"+1{str(i).zfill(10)}",
-                "country": "USA",
-                "timezone": "EST",
-                "categories": ["Health"]
-            }
-            
-            response = await api_client.post(f"/coaches/{test_coach}/clients", json=client_data)
-            if response.status_code == 200:
-                client_ids.append(response.json()["client_id"])
+        rows = [
+            (test_coach, f"Performance Client {i}", f"+1{str(i).zfill(10)}", "USA", "EST")
+            for i in range(100)
+        ]
+        await db_conn.copy_records_to_table(
+            "clients",
+            records=rows,
+            columns=["coach_id", "name", "phone_number", "country", "timezone"]
+        )
         
         creation_time = time.time() - start_time
         
@@ -715,40 +766,60 @@ class TestRunner:
     
     @staticmethod
     def setup_test_database():
-        """Set up test database"""
+        """Set up test database by cloning a cached schema template.
+        
+        The schema is applied once to <test_db>_tmpl and the test database is
+        created from it with CREATE DATABASE ... TEMPLATE (a file copy). The
+        template is rebuilt only when database_schema.sql changes, tracked by
+        a SHA256 checksum stored as the template's comment.
+        """
         try:
-            # Create test database if it doesn't exist
+            import hashlib
             import psycopg2
             from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
             
-            # Connect to postgres to create test database
-            conn = psycopg2.connect(
-                host=TEST_CONFIG["DB_CONFIG"]["host"],
-                port=TEST_CONFIG["DB_CONFIG"]["port"],
-                user=TEST_CONFIG["DB_CONFIG"]["user"],
-                password=TEST_CONFIG["DB_CONFIG"]["password"],
-                database="postgres"
-            )
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            db_config = TEST_CONFIG["DB_CONFIG"]
+            test_db = db_config["database"]
+            template_db = f"{test_db}_tmpl"
             
-            cursor = conn.cursor()
-            cursor.execute(f"DROP DATABASE IF EXISTS {TEST_CONFIG['DB_CONFIG']['database']}")
-            cursor.execute(f"CREATE DATABASE {TEST_CONFIG['DB_CONFIG']['database']}")
+            with open('database_schema.sql', 'r') as f:
+                schema_sql = f.read()
+            checksum = hashlib.sha256(schema_sql.encode()).hexdigest()
             
-            cursor.close()
-            conn.close()
+            # Connect to postgres to manage the template and test databases
+            conn = psycopg2.connect(**{**db_config, "database": "postgres"})
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor = conn.cursor()
             
-            # Run schema on test database
-            test_conn = psycopg2.connect(**TEST_CONFIG["DB_CONFIG"])
-            test_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor.execute(
+                "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s",
+                (template_db,)
+            )
+            row = cursor.fetchone()
+            
+            if row is None or row[0] != checksum:
+                # Template missing or built from an older schema - (re)build it
+                if row is not None:
+                    cursor.execute(f"ALTER DATABASE {template_db} IS_TEMPLATE false")
+                    cursor.execute(f"DROP DATABASE {template_db}")
+                cursor.execute(f"CREATE DATABASE {template_db}")
+                
+                template_conn = psycopg2.connect(**{**db_config, "database": template_db})
+                template_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                template_cursor = template_conn.cursor()
+                template_cursor.execute(schema_sql)
+                template_cursor.close()
+                template_conn.close()
+                
+                cursor.execute(f"COMMENT ON DATABASE {template_db} IS %s", (checksum,))
+                cursor.execute(f"ALTER DATABASE {template_db} IS_TEMPLATE true")
+                print("✅ Test database template built")
             
-            with open('database_schema.sql', 'r') as f:
-                schema_sql = f.read()
+            cursor.execute(f"DROP DATABASE IF EXISTS {test_db}")
+            cursor.execute(f"CREATE DATABASE {test_db} TEMPLATE {template_db}")
             
-            cursor = test_conn.cursor()
-            cursor.execute(schema_sql)
             cursor.close()
-            test_conn.close()
+            conn.close()
             
             print("✅ Test database setup completed")
             
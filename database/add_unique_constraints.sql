@@ -1,5 +1,13 @@
 -- PostgreSQL Constraints to Prevent Duplications
 -- This script adds proper constraints to prevent duplicate data
+--
+-- no-transaction: CREATE INDEX CONCURRENTLY cannot run inside a transaction
+-- block, so each statement must be sent on its own in autocommit mode:
+--   psql -d coaching_system -f database/add_unique_constraints.sql
+-- Do NOT use psql -1/--single-transaction, wrap it in BEGIN/COMMIT, or pass
+-- the whole file to a single asyncpg conn.execute() (a multi-statement
+-- string runs as one implicit transaction). CONCURRENTLY builds the indexes
+-- without blocking writes to categories/message_templates.
 
 -- 1. For Categories Table
 -- Add a partial unique index for predefined categories
@@ -36,7 +44,15 @@ WHERE is_default = false AND coach_id IS NOT NULL;
 -- This should fail:
 -- INSERT INTO message_templates (message_type, content, is_default) VALUES ('celebration', '🎉 What are we celebrating today?', true);
 
--- 4. Show current constraints
+-- 4. A failed concurrent build leaves an INVALID index behind, which
+-- IF NOT EXISTS will then silently skip. Any rows here must be dropped
+-- (DROP INDEX CONCURRENTLY <name>) and this script re-run.
+SELECT indexrelid::regclass AS invalid_index
+FROM pg_index
+WHERE NOT indisvalid
+AND indrelid IN ('categories'::regclass, 'message_templates'::regclass);
+
+-- 5. Show current constraints
 SELECT 
     schemaname,
     tablename,
@@ -21,7 +21,15 @@ CREATE INDEX IF NOT EXISTS idx_whatsapp_conversations_active ON whatsapp_convers
 -- Index for finding active conversations
 CREATE INDEX IF NOT EXISTS idx_whatsapp_conversations_active_expires ON whatsapp_conversations(wa_id, is_active, expires_at);
 
+-- Partial index matching can_send_free_message's filter: only active,
+-- user-initiated rows are indexed, and expires_at is in the key so the
+-- window check is an index-only scan (origin_type is implied by the predicate)
+CREATE INDEX IF NOT EXISTS idx_whatsapp_conversations_user_free_expires
+ON whatsapp_conversations(wa_id, expires_at DESC)
+WHERE is_active AND origin_type = 'user_initiated';
+
 -- Function to check if user can receive free messages
+-- STABLE (not IMMUTABLE) because it depends on NOW() and table data
 CREATE OR REPLACE FUNCTION can_send_free_message(wa_id_param VARCHAR(20))
 RETURNS BOOLEAN AS $$
 BEGIN
@@ -33,7 +41,7 @@ BEGIN
         AND origin_type = 'user_initiated'
     );
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql STABLE;
 
 -- Function to get active conversation for a user
 CREATE OR REPLACE FUNCTION get_active_conversation(wa_id_param VARCHAR(20))
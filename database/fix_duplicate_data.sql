@@ -6,29 +6,26 @@
 
 -- Remove duplicate predefined categories
 -- Keep only the first occurrence of each predefined category
-WITH duplicates AS (
+-- DELETE ... USING joins the window output directly instead of an IN subplan
+DELETE FROM categories c
+USING (
     SELECT id, 
            ROW_NUMBER() OVER (PARTITION BY name ORDER BY created_at) as rn
     FROM categories 
     WHERE is_predefined = true
-)
-DELETE FROM categories 
-WHERE id IN (
-    SELECT id FROM duplicates WHERE rn > 1
-);
+) d
+WHERE c.id = d.id AND d.rn > 1;
 
 -- Remove duplicate predefined message templates
 -- Keep only the first occurrence of each predefined template
-WITH duplicates AS (
+DELETE FROM message_templates t
+USING (
     SELECT id, 
            ROW_NUMBER() OVER (PARTITION BY message_type, content ORDER BY created_at) as rn
     FROM message_templates 
     WHERE is_default = true AND coach_id IS NULL
-)
-DELETE FROM message_templates 
-WHERE id IN (
-    SELECT id FROM duplicates WHERE rn > 1
-);
+) d
+WHERE t.id = d.id AND d.rn > 1;
 
 -- Add a proper unique constraint for predefined categories
 -- This ensures only one predefined category per name
@@ -5,6 +5,7 @@ Test script for WhatsApp template messaging and conversation tracking
 import asyncio
 import httpx
 import json
+import os
 from datetime import datetime
 
 # Test configuration
@@ -126,7 +127,7 @@ async def test_webhook_verification():
                 f"{API_BASE}/webhook/whatsapp",
                 params={
                     "hub.mode": "subscribe",
-                    "hub.verify_token": "test-verify-token",
+                    "hub.verify_token": os.getenv("WEBHOOK_VERIFY_TOKEN", ""),
                     "hub.challenge": "test-challenge-123"
                 }
             )